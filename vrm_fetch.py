@@ -1,74 +1,196 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import datetime as dt
+import functools
+import hashlib
 import json
 import math
 import os
+import random
+import socket
 import sys
+import tempfile
+import threading
 import time
+import types
 import unicodedata
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlencode, urlparse
 
 import requests
-from zoneinfo import ZoneInfo
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    from zoneinfo import ZoneInfo
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used as a fallback
+    orjson = None
 
 BASE = "https://vrmapi.victronenergy.com/v2"
 
+
 # --- Tunables to prevent hangs ---
-CONNECT_TIMEOUT = float(os.environ.get("VRM_CONNECT_TIMEOUT", "4"))  # seconds
-READ_TIMEOUT = float(os.environ.get("VRM_READ_TIMEOUT", "6"))  # seconds
-RETRIES = int(os.environ.get("VRM_RETRIES", "2"))  # attempts (total GETs = RETRIES)
-BACKOFF_BASE = float(os.environ.get("VRM_BACKOFF_BASE", "0.4"))  # seconds
-TOTAL_BUDGET_SEC = float(
-    os.environ.get("VRM_TOTAL_TIMEOUT", "25")
-)  # overall script budget
+class Tunables(NamedTuple):
+    CONNECT_TIMEOUT: float  # seconds
+    READ_TIMEOUT: float  # seconds
+    RETRIES: int  # attempts (total GETs = RETRIES)
+    BACKOFF_BASE: float  # seconds
+    TOTAL_BUDGET_SEC: float  # overall script budget
+    # The alarms request already passes active=true; True re-checks each record
+    VERIFY_ALARM_ACTIVE: bool
+    # Optional time window for /stats, 0 = API default. Must stay well beyond
+    # the normal ~1 h data lag or timestamp_data (used to detect
+    # disconnection) can go missing on a healthy site.
+    STATS_WINDOW_SEC: int  # seconds
+    # True skips the on-disk cache of user id / installations entirely
+    NO_CACHE: bool
+
+
+@functools.lru_cache(maxsize=1)
+def _tunables() -> Tunables:
+    """Read the VRM_* environment tunables on first use, not at import."""
+    env = os.environ.get
+    return Tunables(
+        CONNECT_TIMEOUT=float(env("VRM_CONNECT_TIMEOUT", "4")),
+        READ_TIMEOUT=float(env("VRM_READ_TIMEOUT", "6")),
+        RETRIES=int(env("VRM_RETRIES", "2")),
+        BACKOFF_BASE=float(env("VRM_BACKOFF_BASE", "0.4")),
+        TOTAL_BUDGET_SEC=float(env("VRM_TOTAL_TIMEOUT", "25")),
+        VERIFY_ALARM_ACTIVE=env("VRM_VERIFY_ALARM_ACTIVE") == "1",
+        STATS_WINDOW_SEC=int(env("VRM_STATS_WINDOW", "0")),
+        NO_CACHE=env("VRM_NO_CACHE") == "1",
+    )
 
-SESSION = requests.Session()
+
+SITE_WORKERS = 4  # concurrent per-site GETs (stats + alarms for two sites)
+DNS_HOST = urlparse(BASE).hostname  # only host whose lookups are cached
+DNS_TTL_SEC = 300
 
 
-def auth_headers(token: str) -> Dict[str, str]:
-    return {
-        "X-Authorization": f"Token {token}",
+def json_loads(b: bytes) -> Any:
+    # Decode raw bytes directly, skipping requests' charset detection.
+    return orjson.loads(b) if orjson is not None else json.loads(b)
+
+
+def json_dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+# Every call hits the same host: keep one sized, keep-alive pool so the TLS
+# handshake is paid once. Retries are handled by api_get, not urllib3.
+SESSION = requests.Session()
+_retry = Retry(total=0, connect=0, read=0, status=0, backoff_factor=0)
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=2 * SITE_WORKERS,  # never fewer connections than worker threads
+    pool_block=True,
+    max_retries=_retry,
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+SESSION.headers.update(
+    {
         "Accept": "application/json",
         "User-Agent": "vrm-fetch-v9/alarms/1.0 (+python)",
+        "Connection": "keep-alive",
     }
+)
+
+
+def install_dns_cache() -> None:
+    """
+    Cache socket.getaddrinfo results for the VRM API host only, for
+    DNS_TTL_SEC; other hosts go straight to the original resolver. Lookups
+    are serialized so the concurrent per-site calls resolve once. Only
+    installed by main(), never on import.
+    """
+    if getattr(socket.getaddrinfo, "_vrm_cached", False):
+        return
+    orig_gai = socket.getaddrinfo
+    lock = threading.Lock()
+    entries: Dict[Any, Tuple[float, Any]] = {}
+
+    def getaddrinfo(host: Any, port: Any, *args: Any, **kwargs: Any) -> Any:
+        if host != DNS_HOST:
+            return orig_gai(host, port, *args, **kwargs)
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        with lock:
+            now = time.monotonic()
+            hit = entries.get(key)
+            if hit is None or hit[0] <= now:
+                hit = (now + DNS_TTL_SEC, orig_gai(host, port, *args, **kwargs))
+                entries[key] = hit
+            return list(hit[1])
+
+    getaddrinfo._vrm_cached = True  # type: ignore[attr-defined]
+    socket.getaddrinfo = getaddrinfo
+
+
+@functools.lru_cache(maxsize=2)
+def auth_headers(token: str) -> Mapping[str, str]:
+    # Read-only: the cached mapping is shared by every caller.
+    return types.MappingProxyType({"X-Authorization": f"Token {token}"})
 
 
 def api_get(
-    path: str, token: str, params: Optional[Dict[str, Any]] = None, *, t0: float
+    path: str, params: Optional[Dict[str, Any]] = None, *, t0: float
 ) -> Dict[str, Any]:
     """GET with bounded retries and overall-budget awareness."""
     url = path if path.startswith("http") else f"{BASE}{path}"
+    tun = _tunables()
     attempt = 0
-    while attempt < RETRIES:
-        remaining = TOTAL_BUDGET_SEC - (time.monotonic() - t0)
+    while attempt < tun.RETRIES:
+        remaining = tun.TOTAL_BUDGET_SEC - (time.monotonic() - t0)
         if remaining <= 0:
             raise TimeoutError(
-                f"Global timeout exceeded ({TOTAL_BUDGET_SEC}s) before calling {url}"
+                f"Global timeout exceeded ({tun.TOTAL_BUDGET_SEC}s) "
+                f"before calling {url}"
             )
         # Per-request time budget (split between connect & read, bounded by remaining)
-        connect_t = min(CONNECT_TIMEOUT, max(0.5, remaining / 2))
-        read_t = min(READ_TIMEOUT, max(0.5, remaining / 2))
+        connect_t = min(tun.CONNECT_TIMEOUT, max(0.5, remaining / 2))
+        read_t = min(tun.READ_TIMEOUT, max(0.5, remaining / 2))
         try:
             r = SESSION.get(
                 url,
-                headers=auth_headers(token),
                 params=params,
                 timeout=(connect_t, read_t),
                 allow_redirects=False,
-                stream=False,
             )
             if r.status_code == 401:
                 raise SystemExit("401 Unauthorized (token inválido o sin permisos).")
             r.raise_for_status()
-            return r.json()
+            return json_loads(r.content)
         except (requests.Timeout, requests.ConnectionError) as e:
             attempt += 1
-            if attempt >= RETRIES:
+            if attempt >= tun.RETRIES:
+                raise
+            # Full-jitter backoff, capped so a full connect+read window is
+            # still left in the global budget for the next attempt.
+            budget_left = tun.TOTAL_BUDGET_SEC - (time.monotonic() - t0)
+            reserve = tun.CONNECT_TIMEOUT + tun.READ_TIMEOUT
+            max_sleep = max(0.0, budget_left - reserve)
+            if max_sleep <= 0:
                 raise
-            # brief, bounded backoff but do not violate global budget
-            sleep_s = min(BACKOFF_BASE * (2 ** (attempt - 1)), max(0.1, remaining / 4))
-            time.sleep(sleep_s)
+            sleep_s = min(tun.BACKOFF_BASE * (2 ** (attempt - 1)), max_sleep)
+            time.sleep(random.uniform(0, sleep_s))
         except requests.RequestException:
             # Non-timeout HTTP errors: do not spin forever; fail fast
             raise
@@ -76,7 +198,94 @@ def api_get(
     raise TimeoutError(f"Failed to GET {url} within retry budget")
 
 
+# user id never changes and the installation list rarely does: keep them in a
+# small on-disk cache so warm runs skip those two round-trips.
+USER_ID_TTL_SEC = 7 * 86400
+INSTALLS_TTL_SEC = 86400
+
+
+def cache_path(token: str) -> str:
+    # Per-user cache dir, not the shared temp dir: cached site ids end up in
+    # request paths, so other local users must not be able to plant them.
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    digest = hashlib.sha1(token.encode()).hexdigest()[:12]
+    return os.path.join(base, "vrm-fetch", f"vrm_cache_{digest}.json")
+
+
+def _load_cache(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            st = os.fstat(f.fileno())
+            # Ignore files someone else owns or could have written
+            if hasattr(os, "getuid") and (
+                st.st_uid != os.getuid() or st.st_mode & 0o022
+            ):
+                return {}
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def cached(path: str, key: str, ttl: float, fetch_fn: Callable[[], Any]) -> Any:
+    """
+    Return entries[key] from the JSON cache at path if not expired, else call
+    fetch_fn() and store its result. Empty results are never cached.
+    VRM_NO_CACHE=1 bypasses the cache (no read, no write).
+    """
+    if _tunables().NO_CACHE:
+        return fetch_fn()
+    entries = _load_cache(path)
+    hit = entries.get(key)
+    if isinstance(hit, dict):
+        expires = hit.get("expires")
+        if isinstance(expires, (int, float)) and expires > time.time():
+            return hit.get("value")
+    value = fetch_fn()
+    if not value:
+        return value
+    # Re-read: fetch_fn may itself have stored other keys in the meantime.
+    entries = _load_cache(path)
+    entries[key] = {"expires": time.time() + ttl, "value": value}
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # cache is best-effort
+    return value
+
+
+# Fast path for the Spanish accents used in installation names; anything else
+# still goes through the NFD decomposition below.
+_ACCENTS = str.maketrans(
+    {
+        "á": "a",
+        "é": "e",
+        "í": "i",
+        "ó": "o",
+        "ú": "u",
+        "ü": "u",
+        "ñ": "n",
+        "Á": "A",
+        "É": "E",
+        "Í": "I",
+        "Ó": "O",
+        "Ú": "U",
+        "Ü": "U",
+        "Ñ": "N",
+    }
+)
+
+
 def strip_accents(s: str) -> str:
+    s = s.translate(_ACCENTS)
+    if s.isascii():
+        return s
     return "".join(
         c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn"
     )
@@ -86,21 +295,62 @@ def norm(s: str) -> str:
     return strip_accents(s or "").casefold()
 
 
-def users_me(token: str, t0: float) -> Optional[int]:
-    j = api_get("/users/me", token, t0=t0)
+def users_me(t0: float) -> Optional[int]:
+    j = api_get("/users/me", t0=t0)
     user = j.get("user") if isinstance(j, dict) else None
     if isinstance(user, dict):
         return user.get("id")
     return None
 
 
-def list_installations_by_user(
-    token: str, user_id: int, t0: float
-) -> List[Dict[str, Any]]:
-    j = api_get(f"/users/{user_id}/installations", token, t0=t0)
+def list_installations_by_user(user_id: int, t0: float) -> List[Dict[str, Any]]:
+    j = api_get(f"/users/{user_id}/installations", t0=t0)
     return j.get("records", []) if isinstance(j, dict) else []
 
 
+def _installations_self(t0: float) -> Optional[List[Dict[str, Any]]]:
+    """
+    Single-attempt probe of /users/self/installations, which the API may not
+    support. Bypasses api_get so a 401 here never aborts the run; any error
+    status, network error or response without records yields None.
+    """
+    tun = _tunables()
+    remaining = tun.TOTAL_BUDGET_SEC - (time.monotonic() - t0)
+    if remaining <= 0:
+        return None
+    try:
+        r = SESSION.get(
+            f"{BASE}/users/self/installations",
+            timeout=(
+                min(tun.CONNECT_TIMEOUT, max(0.5, remaining / 2)),
+                min(tun.READ_TIMEOUT, max(0.5, remaining / 2)),
+            ),
+            allow_redirects=False,
+        )
+        if r.status_code != 200:
+            return None
+        j = json_loads(r.content)
+    except (requests.RequestException, ValueError):
+        return None
+    recs = j.get("records") if isinstance(j, dict) else None
+    return recs if isinstance(recs, list) and recs else None
+
+
+def list_installations(cpath: str, t0: float) -> Optional[List[Dict[str, Any]]]:
+    """
+    Installations of the token's user in one round-trip via /users/self when
+    the API accepts it, else /users/me + /users/{id}/installations.
+    Returns None if the user id cannot be resolved.
+    """
+    installs = _installations_self(t0)
+    if installs is not None:
+        return installs
+    user_id = cached(cpath, "users_me", USER_ID_TTL_SEC, lambda: users_me(t0))
+    if user_id is None:
+        return None
+    return list_installations_by_user(user_id, t0)
+
+
 def build_site_tz_map(installs: List[Dict[str, Any]]) -> Dict[int, str]:
     m: Dict[int, str] = {}
     for it in installs:
@@ -111,59 +361,97 @@ def build_site_tz_map(installs: List[Dict[str, Any]]) -> Dict[int, str]:
     return m
 
 
-def pick_site_id(installs: List[Dict[str, Any]], want_contains: str) -> Optional[int]:
-    target = norm(want_contains)
+# norm() already folds accents and case, so one target per site is enough.
+GEN_TARGETS = ("generacion",)
+CON_TARGETS = ("consumo",)
+# Only the series main() reads from each site's /stats
+GEN_ATTRS = ("solar_yield", "from_to_grid", "bs")
+CON_ATTRS = ("ac_loads",)
+
+
+def pick_site_ids(
+    installs: List[Dict[str, Any]],
+) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Single pass over installs returning (gen_id, con_id); the first match
+    for each site wins, stopping as soon as both are found.
+    """
+    gen_id: Optional[int] = None
+    con_id: Optional[int] = None
     for it in installs:
-        name = it.get("name") or ""
-        if target in norm(name):
-            return it.get("idSite")
-    return None
+        name = norm(it.get("name") or "")
+        if gen_id is None and any(t in name for t in GEN_TARGETS):
+            gen_id = it.get("idSite")
+        if con_id is None and any(t in name for t in CON_TARGETS):
+            con_id = it.get("idSite")
+        if gen_id is not None and con_id is not None:
+            break
+    return gen_id, con_id
+
+
+@functools.lru_cache(maxsize=8)
+def _stats_query(attrs: Tuple[str, ...]) -> str:
+    # Fixed part of the /stats query string, rendered once per attrs tuple
+    return urlencode([("type", "venus")] + [("attributeCodes[]", a) for a in attrs])
 
 
-def venus_stats(token: str, site_id: int, t0: float) -> Dict[str, Any]:
-    return api_get(
-        f"/installations/{site_id}/stats", token, params={"type": "venus"}, t0=t0
+def venus_stats(site_id: int, t0: float, attrs: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """
+    attrs: restrict the response to these attribute codes (all if empty).
+    Only the last STATS_WINDOW_SEC seconds are requested (0 = API default).
+    """
+    url = f"/installations/{site_id}/stats?{_stats_query(attrs)}"
+    window = _tunables().STATS_WINDOW_SEC
+    if window > 0:
+        end = int(time.time())
+        url += f"&start={end - window}&end={end}"
+    return api_get(url, t0=t0)
+
+
+def _alarm_records(j: Any) -> List[Dict[str, Any]]:
+    # possible shapes, first list found wins:
+    #  - {"success": true, "records": [...]}
+    #  - {"success": true, "data": {"records": [...]}}  (less likely here)
+    #  - same two with "alarms" instead of "records"
+    if not isinstance(j, dict):
+        return []
+    data = j.get("data")
+    containers = (j, data) if isinstance(data, dict) else (j,)
+    for key in ("records", "alarms"):
+        for c in containers:
+            recs = c.get(key)
+            if isinstance(recs, list):
+                return recs
+    return []
+
+
+def _alarm_is_active(a: Dict[str, Any]) -> bool:
+    active_flag = a.get("active")
+    return (
+        active_flag is True or active_flag == 1 or a.get("state") in ("active", 1, "1")
     )
 
 
-def get_active_alarms(token: str, site_id: int, t0: float) -> List[Dict[str, Any]]:
+def get_active_alarms(site_id: int, t0: float) -> List[Dict[str, Any]]:
     """
     Fetch active alarms for a site. We try to be flexible with response shape.
     """
     try:
-        j = api_get(
-            f"/installations/{site_id}/alarms", token, params={"active": "true"}, t0=t0
-        )
+        j = api_get(f"/installations/{site_id}/alarms?active=true", t0=t0)
     except Exception:
         return []
-    data = j.get("data") if isinstance(j, dict) else None
-    # possible shapes:
-    #  - {"success": true, "records": [...]}
-    #  - {"success": true, "data": {"records": [...]}}  (less likely here)
-    recs = []
-    if isinstance(j, dict) and "records" in j and isinstance(j["records"], list):
-        recs = j["records"]
-    elif isinstance(data, dict) and isinstance(data.get("records"), list):
-        recs = data["records"]
-    elif isinstance(j, dict) and isinstance(j.get("alarms"), list):
-        recs = j["alarms"]
-    elif isinstance(data, dict) and isinstance(data.get("alarms"), list):
-        recs = data["alarms"]
-
-    out: List[Dict[str, Any]] = []
-    for a in recs or []:
-        active_flag = a.get("active")
-        state = a.get("state")
-        if active_flag is True or active_flag == 1 or state in ("active", 1, "1"):
-            out.append(
-                {
-                    "time": a.get("startTime") or a.get("timestamp") or a.get("time"),
-                    "name": a.get("name") or a.get("title") or a.get("code"),
-                    "severity": a.get("severity"),
-                    "message": a.get("message") or a.get("text"),
-                }
-            )
-    return out
+    recs = [a for a in _alarm_records(j) if isinstance(a, dict)]
+    if _tunables().VERIFY_ALARM_ACTIVE:
+        recs = [a for a in recs if _alarm_is_active(a)]
+    return [
+        {
+            "time": a.get("startTime") or a.get("timestamp") or a.get("time"),
+            "name": a.get("name") or a.get("title") or a.get("code"),
+            "severity": a.get("severity"),
+            "message": a.get("message") or a.get("text"),
+        }
+        for a in recs
+    ]
 
 
 def last_point_value(
@@ -177,19 +465,15 @@ def last_point_value(
     """
     if not isinstance(entries, list) or not entries:
         return (None, None)
-    # Scan from the end to get the latest non-null; bounded
-    for idx in range(len(entries) - 1, -1, -1):
-        pt = entries[idx]
-        if not isinstance(pt, (list, tuple)) or len(pt) < 2:
-            continue
-        ts = pt[0] if isinstance(pt[0], (int, float)) else None
-        if ts is None:
+    # Both modes read index 1 ([ts, value] or [ts, avg, ...]), so a single
+    # reverse scan serves both; stop at the latest valid point.
+    _isinst = isinstance
+    _isnan = math.isnan
+    for pt in reversed(entries):
+        if not _isinst(pt, (list, tuple)) or len(pt) < 2:
             continue
-        if prefer_avg and len(pt) >= 2 and isinstance(pt[1], (int, float)):
-            val = float(pt[1])
-        else:
-            val = pt[1] if isinstance(pt[1], (int, float)) else None
-        if val is not None and not math.isnan(val):
+        ts, val = pt[0], pt[1]
+        if _isinst(ts, (int, float)) and _isinst(val, (int, float)) and not _isnan(val):
             return (int(ts), float(val))
     return (None, None)
 
@@ -202,10 +486,18 @@ def utc_now_iso() -> str:
     return iso_utc(dt.datetime.now(dt.UTC))
 
 
+@functools.lru_cache(maxsize=16)
+def _zi(name: str) -> "ZoneInfo":
+    # Imported on first use: early exits and tz-less sites never load tzdata
+    from zoneinfo import ZoneInfo
+
+    return ZoneInfo(name)
+
+
 def site_local_ms_to_utc_iso(ms: int, site_tz: Optional[str]) -> str:
     try:
         if site_tz:
-            local = dt.datetime.fromtimestamp(ms / 1000, ZoneInfo(site_tz))
+            local = dt.datetime.fromtimestamp(ms / 1000, _zi(site_tz))
             return iso_utc(local)
     except Exception:
         pass
@@ -221,102 +513,117 @@ def main() -> int:
         or "e5352471d358f93967e2e1b0bd660a33b63e6342935230f45098744174dd0687"
     )
 
-    user_id = users_me(token, t0)
-    if user_id is None:
+    install_dns_cache()
+    SESSION.headers.update(auth_headers(token))
+
+    cpath = cache_path(token)
+    installs = cached(
+        cpath, "installations", INSTALLS_TTL_SEC, lambda: list_installations(cpath, t0)
+    )
+    if installs is None:
         print("No pude obtener user id con /users/me", file=sys.stderr)
         return 2
-
-    installs = list_installations_by_user(token, user_id, t0)
     if not installs:
         print("No hay instalaciones en /users/{id}/installations", file=sys.stderr)
         return 3
 
     site_tz_map = build_site_tz_map(installs)
 
-    gen_id = pick_site_id(installs, "Generacion") or pick_site_id(
-        installs, "generación"
-    )
-    con_id = pick_site_id(installs, "Consumo") or pick_site_id(installs, "consumo")
+    gen_id, con_id = pick_site_ids(installs)
 
-    out = {
-        "timestamp_utc": utc_now_iso(),
-        "timestamp_data": None,
-        "generación": {
-            "solar": {"potencia_w": None},
-            "red": {"potencia_w": None},
-            "bateria": {"bateria_soc_pct": None},
-            "alarmas": [],  # <-- nuevo
-        },
-        "consumo": {
-            "potencia_w": None,
-            "alarmas": [],  # <-- nuevo
-        },
-        "notes": [],
-    }
+    query_ts = utc_now_iso()
+    sol_w: Optional[float] = None
+    red_w: Optional[float] = None
+    bat_pct: Optional[float] = None
+    con_w: Optional[float] = None
+    gen_alarms: List[Dict[str, Any]] = []
+    con_alarms: List[Dict[str, Any]] = []
+    ts_data: Optional[str] = None
+    notes: List[str] = []
 
     timestamp_candidates: List[Tuple[int, Optional[str]]] = []
 
+    # The per-site stats/alarms calls are independent: overlap their network
+    # waits so wall time is bounded by the slowest call, not the sum.
+    with ThreadPoolExecutor(max_workers=SITE_WORKERS) as ex:
+        futs = {}
+        if gen_id is not None:
+            futs["vgen"] = ex.submit(venus_stats, gen_id, t0, GEN_ATTRS)
+            futs["agen"] = ex.submit(get_active_alarms, gen_id, t0)
+        if con_id is not None:
+            futs["vcon"] = ex.submit(venus_stats, con_id, t0, CON_ATTRS)
+            futs["acon"] = ex.submit(get_active_alarms, con_id, t0)
+
     # GENERACIÓN
     if gen_id is not None:
-        vgen = venus_stats(token, gen_id, t0)
+        vgen = futs["vgen"].result()
         rec_g = vgen.get("records", {}) if isinstance(vgen, dict) else {}
         gen_tz = site_tz_map.get(gen_id)
 
-        ts, val = last_point_value(rec_g.get("solar_yield", []), prefer_avg=False)
-        if val is not None:
-            out["generación"]["solar"]["potencia_w"] = val
+        ts, sol_w = last_point_value(rec_g.get("solar_yield", []), prefer_avg=False)
         if ts is not None:
             timestamp_candidates.append((ts, gen_tz))
 
-        ts, val = last_point_value(rec_g.get("from_to_grid", []), prefer_avg=False)
-        if val is not None:
-            out["generación"]["red"]["potencia_w"] = val
+        ts, red_w = last_point_value(rec_g.get("from_to_grid", []), prefer_avg=False)
         if ts is not None:
             timestamp_candidates.append((ts, gen_tz))
 
-        ts, val = last_point_value(rec_g.get("bs", []), prefer_avg=True)
-        if val is not None:
-            out["generación"]["bateria"]["bateria_soc_pct"] = val
+        ts, bat_pct = last_point_value(rec_g.get("bs", []), prefer_avg=True)
         if ts is not None:
             timestamp_candidates.append((ts, gen_tz))
 
         # alarmas activas
         try:
-            out["generación"]["alarmas"] = get_active_alarms(token, gen_id, t0)
+            gen_alarms = futs["agen"].result()
         except Exception as e:
-            out["notes"].append(f"Error leyendo alarmas de generación: {e}")
+            notes.append(f"Error leyendo alarmas de generación: {e}")
     else:
-        out["notes"].append(
+        notes.append(
             "No se encontró la instalación de generación (nombre contiene 'Generacion' o 'generación')."
         )
 
     # CONSUMO
     if con_id is not None:
-        vcon = venus_stats(token, con_id, t0)
+        vcon = futs["vcon"].result()
         rec_c = vcon.get("records", {}) if isinstance(vcon, dict) else {}
         con_tz = site_tz_map.get(con_id)
 
-        ts, val = last_point_value(rec_c.get("ac_loads", []), prefer_avg=False)
-        if val is not None:
-            out["consumo"]["potencia_w"] = val
+        ts, con_w = last_point_value(rec_c.get("ac_loads", []), prefer_avg=False)
         if ts is not None:
             timestamp_candidates.append((ts, con_tz))
 
         # alarmas activas
         try:
-            out["consumo"]["alarmas"] = get_active_alarms(token, con_id, t0)
+            con_alarms = futs["acon"].result()
         except Exception as e:
-            out["notes"].append(f"Error leyendo alarmas de consumo: {e}")
+            notes.append(f"Error leyendo alarmas de consumo: {e}")
     else:
-        out["notes"].append(
+        notes.append(
             "No se encontró la instalación de consumo (nombre contiene 'Consumo')."
         )
 
     if timestamp_candidates:
         latest_ts, latest_tz = max(timestamp_candidates, key=lambda x: x[0])
-        out["timestamp_data"] = site_local_ms_to_utc_iso(latest_ts, latest_tz)
+        ts_data = site_local_ms_to_utc_iso(latest_ts, latest_tz)
+
+    # Built once, after every value is known
+    out = {
+        "timestamp_utc": query_ts,
+        "timestamp_data": ts_data,
+        "generación": {
+            "solar": {"potencia_w": sol_w},
+            "red": {"potencia_w": red_w},
+            "bateria": {"bateria_soc_pct": bat_pct},
+            "alarmas": gen_alarms,
+        },
+        "consumo": {
+            "potencia_w": con_w,
+            "alarmas": con_alarms,
+        },
+        "notes": notes,
+    }
 
-    print(json.dumps(out, ensure_ascii=False, indent=2))
+    print(json_dumps(out))
     return 0
 
 